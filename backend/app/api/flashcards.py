@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+from typing import Iterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal, get_db
+from app.core.deps import get_current_user
+from app.models.document import Document
+from app.models.flashcard import Flashcard
+from app.models.user import User
+from app.schemas.flashcard import FlashcardGenerateRequest, FlashcardOut
+from app.services.flashcards import (
+    document_has_chunks,
+    encode_ndjson,
+    encode_sse,
+    get_generator,
+    get_job_limiter,
+    load_document_chunks,
+    select_representative,
+    split_text,
+    start_flashcard_job,
+)
+
+logger = logging.getLogger("studynote.api.flashcards")
+
+router = APIRouter(prefix="/flashcards", tags=["Flashcards"])
+
+
+def _get_owned_document(db: Session, document_id: str, user: User) -> Document:
+    doc = db.execute(select(Document).where(Document.id == document_id)).scalar_one_or_none()
+    if not doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    if doc.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return doc
+
+
+@router.post(
+    "",
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/event-stream": {}}}},
+)
+def generate_flashcards(
+    payload: FlashcardGenerateRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Generate flashcards from a document's chunks (or raw text) in batches.
+    The job runs in the background and keeps saving cards if the client disconnects
+    (they show up in GET /flashcards); the response follows its progress.
+    Cards are streamed as each batch completes: NDJSON by default, or SSE when the
+    client sends Accept: text/event-stream. Each line/event is one of
+    {"event": "cards", "batch", "total_batches", "cards": [...]}, {"event": "done", ...}
+    or {"event": "error", "detail"}.
+    """
+    settings = get_settings()
+
+    if payload.document_id:
+        doc = _get_owned_document(db, payload.document_id, user)
+        if not document_has_chunks(db, doc.id):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Document has not been processed yet")
+        chunks = load_document_chunks(db, doc.id, user_id=user.id, limit=settings.FLASHCARD_MAX_CHUNKS)
+        if not chunks:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Flashcards were already generated from every part of this document",
+            )
+        document_id: Optional[str] = doc.id
+    else:
+        pieces = split_text(payload.text or "")
+        picked = select_representative([len(p.text) for p in pieces], settings.FLASHCARD_MAX_CHUNKS)
+        chunks = [pieces[i] for i in picked]
+        document_id = None
+
+    try:
+        generator = get_generator()
+    except ValueError as e:
+        logger.error("Flashcard generator misconfigured: %s", e)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Flashcard generation unavailable")
+
+    user_id = user.id
+    # The request-scoped session would otherwise stay checked out (idle in transaction)
+    # until the whole stream has been sent; everything the job needs is loaded by now.
+    db.commit()
+    db.close()
+
+    slot = get_job_limiter().acquire(user_id)
+    if slot is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many flashcard jobs in progress, try again shortly",
+        )
+
+    use_sse = "text/event-stream" in request.headers.get("accept", "")
+    encode = encode_sse if use_sse else encode_ndjson
+
+    job = start_flashcard_job(
+        SessionLocal,
+        slot,
+        user_id=user_id,
+        document_id=document_id,
+        chunks=chunks,
+        max_cards=payload.max_cards,
+        generator=generator,
+        batch_size=settings.FLASHCARD_BATCH_SIZE,
+    )
+
+    def stream() -> Iterator[str]:
+        for event in job.events():
+            yield encode(event)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("", response_model=List[FlashcardOut])
+def list_flashcards(
+    document_id: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> List[FlashcardOut]:
+    """
+    List the current user's flashcards, optionally filtered by document.
+    """
+    stmt = select(Flashcard).where(Flashcard.user_id == user.id)
+    if document_id:
+        _get_owned_document(db, document_id, user)
+        stmt = stmt.where(Flashcard.document_id == document_id)
+    stmt = stmt.order_by(Flashcard.created_at, Flashcard.id).offset(offset).limit(limit)
+
+    cards = db.execute(stmt).scalars().all()
+    return [FlashcardOut.model_validate(c) for c in cards]
@@ -41,6 +41,17 @@ class Settings:
     # Security / Rate limits (placeholders for later phases)
     RATE_LIMIT_LOGIN_PER_MIN: int = int(os.getenv("RATE_LIMIT_LOGIN_PER_MIN", "30"))
 
+    # Flashcards
+    # Generator backend; "local" is a deterministic, offline generator (LLM providers plug in later)
+    FLASHCARD_GENERATOR: str = os.getenv("FLASHCARD_GENERATOR", "local")
+    # Number of chunks sent to the generator per batch (one streamed event per batch)
+    FLASHCARD_BATCH_SIZE: int = int(os.getenv("FLASHCARD_BATCH_SIZE", "8"))
+    # Upper bound on chunks sampled from a single document per job
+    FLASHCARD_MAX_CHUNKS: int = int(os.getenv("FLASHCARD_MAX_CHUNKS", "64"))
+    # Concurrent generation jobs allowed across the process / per user
+    FLASHCARD_MAX_CONCURRENT_JOBS: int = int(os.getenv("FLASHCARD_MAX_CONCURRENT_JOBS", "8"))
+    FLASHCARD_MAX_JOBS_PER_USER: int = int(os.getenv("FLASHCARD_MAX_JOBS_PER_USER", "2"))
+
     @property
     def cors_origins(self) -> List[str]:
         return [o.strip() for o in self.FRONTEND_ORIGINS.split(",") if o.strip()]
@@ -7,11 +7,15 @@ from app.core.config import get_settings
 from app.core.database import Base, engine
 from app.api.auth import router as auth_router
 from app.api.documents import router as documents_router  # Phase 2
+from app.api.flashcards import router as flashcards_router  # Phase 6
 
 # Ensure models are imported so metadata includes their tables before create_all
 # noqa imports used only for side effects
 from app.models import user as _models_user  # noqa: F401
 from app.models import document as _models_document  # noqa: F401
+from app.models import chunk as _models_chunk  # noqa: F401
+from app.models import flashcard as _models_flashcard  # noqa: F401
+from app.models import flashcard_chunk as _models_flashcard_chunk  # noqa: F401
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -79,6 +83,7 @@ def create_app() -> FastAPI:
     # Routers
     app.include_router(auth_router)
     app.include_router(documents_router)
+    app.include_router(flashcards_router)
 
     return app
 
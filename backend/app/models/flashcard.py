@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+def _uuid_str() -> str:
+    return str(uuid4())
+
+
+class Flashcard(Base):
+    __tablename__ = "flashcards"
+    __table_args__ = (
+        # One card per normalized question per source; generation inserts with ON CONFLICT DO NOTHING.
+        # NULLs never conflict in a unique index, so cards from pasted text (no document) get their own.
+        Index("uq_flashcards_user_document_hash", "user_id", "document_id", "question_hash", unique=True),
+        Index(
+            "uq_flashcards_user_text_hash",
+            "user_id",
+            "question_hash",
+            unique=True,
+            sqlite_where=text("document_id IS NULL"),
+            postgresql_where=text("document_id IS NULL"),
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid_str)
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    document_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("documents.id", ondelete="CASCADE"), nullable=True)
+
+    question: Mapped[str] = mapped_column(Text, nullable=False)
+    answer: Mapped[str] = mapped_column(Text, nullable=False)
+    difficulty: Mapped[str] = mapped_column(String(20), default="medium")  # easy | medium | hard
+
+    # chunk_order of the source chunk (None for generators that do not report it)
+    chunk_order: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    # sha1 of the normalized question text
+    question_hash: Mapped[str] = mapped_column(String(40), nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+def _uuid_str() -> str:
+    return str(uuid4())
+
+
+class FlashcardChunk(Base):
+    # Document chunks a user's flashcard jobs have fully processed (whether or not they produced cards),
+    # so later jobs on the same document sample new material.
+    __tablename__ = "flashcard_chunks"
+    __table_args__ = (
+        Index("uq_flashcard_chunks_user_document_order", "user_id", "document_id", "chunk_order", unique=True),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid_str)
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    document_id: Mapped[str] = mapped_column(String(36), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    chunk_order: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    processed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
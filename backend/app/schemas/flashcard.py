@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+
+
+class FlashcardGenerateRequest(BaseModel):
+    # Exactly one source: a registered document (uses its extracted chunks) or raw text
+    document_id: Optional[str] = None
+    text: Optional[str] = Field(None, max_length=200_000)
+    max_cards: int = Field(50, ge=1, le=500, description="Stop once this many new cards were created")
+
+    @model_validator(mode="after")
+    def _one_source(self) -> "FlashcardGenerateRequest":
+        has_text = bool(self.text and self.text.strip())
+        if bool(self.document_id) == has_text:
+            raise ValueError("Provide exactly one of document_id or text")
+        return self
+
+
+class FlashcardOut(BaseModel):
+    id: str
+    user_id: str
+    document_id: Optional[str] = None
+    question: str
+    answer: str
+    difficulty: str
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,517 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol, Sequence, Set
+from uuid import uuid4
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.chunk import Chunk
+from app.models.flashcard import Flashcard
+from app.models.flashcard_chunk import FlashcardChunk
+from app.schemas.flashcard import FlashcardOut
+
+logger = logging.getLogger("studynote.flashcards")
+
+
+@dataclass(frozen=True)
+class ChunkText:
+    order: int
+    text: str
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class GeneratedCard:
+    question: str
+    answer: str
+    difficulty: str = "medium"
+    chunk_order: Optional[int] = None
+
+
+# ---------------------------------------------------------------------------
+# Chunk selection
+# ---------------------------------------------------------------------------
+
+def select_representative(lengths: Sequence[int], limit: int) -> List[int]:
+    """
+    Pick up to `limit` indexes spread evenly across a document.
+    The sequence is split into `limit` equal windows and the longest entry of each
+    window is kept, so a 300-page document is sampled end to end rather than front-loaded.
+    """
+    n = len(lengths)
+    if limit <= 0 or n == 0:
+        return []
+    if n <= limit:
+        return list(range(n))
+
+    picked: List[int] = []
+    for w in range(limit):
+        start = (w * n) // limit
+        end = ((w + 1) * n) // limit
+        best = max(range(start, end), key=lambda i: (lengths[i], -i))
+        picked.append(best)
+    return picked
+
+
+def document_has_chunks(db: Session, document_id: str) -> bool:
+    return db.execute(select(Chunk.id).where(Chunk.document_id == document_id).limit(1)).first() is not None
+
+
+def load_document_chunks(db: Session, document_id: str, user_id: str, limit: int) -> List[ChunkText]:
+    """
+    Load a representative sample of the document chunks no earlier job of this user has
+    processed, so repeated jobs on the same document move on to new material.
+    Only chunk lengths are read for the full document; text is fetched for the selected rows.
+    """
+    used = select(FlashcardChunk.chunk_order).where(
+        FlashcardChunk.user_id == user_id,
+        FlashcardChunk.document_id == document_id,
+    )
+    rows = db.execute(
+        select(Chunk.id, func.length(Chunk.text))
+        .where(Chunk.document_id == document_id, Chunk.chunk_order.not_in(used))
+        .order_by(Chunk.chunk_order)
+    ).all()
+    picked = select_representative([length or 0 for _, length in rows], limit)
+    if not picked:
+        return []
+
+    ids = [rows[i][0] for i in picked]
+    chunks = db.execute(select(Chunk).where(Chunk.id.in_(ids)).order_by(Chunk.chunk_order)).scalars().all()
+    return [ChunkText(order=c.chunk_order, text=c.text, page_start=c.page_start, page_end=c.page_end) for c in chunks]
+
+
+_paragraph_re = re.compile(r"\n\s*\n")
+_sentence_re = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_long(para: str, target_chars: int) -> Iterator[str]:
+    """
+    Break a paragraph longer than `target_chars` on sentence boundaries, and a
+    sentence that is still too long on the last space before the limit.
+    """
+    if len(para) <= target_chars:
+        yield para
+        return
+    for sentence in _sentence_re.split(para):
+        while len(sentence) > target_chars:
+            cut = sentence.rfind(" ", 0, target_chars + 1)
+            if cut <= 0:
+                cut = target_chars
+            yield sentence[:cut]
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            yield sentence
+
+
+def split_text(text: str, target_chars: int = 2000) -> List[ChunkText]:
+    """
+    Split raw text into chunks of at most ~`target_chars` characters.
+    Paragraphs are kept together where possible; text pasted without blank lines
+    (common for PDF copies) falls back to sentence and then hard-length splits.
+    """
+    chunks: List[ChunkText] = []
+    buf = ""
+    for para in _paragraph_re.split(text):
+        para = " ".join(para.split())
+        if not para:
+            continue
+        sep = "\n\n"
+        for piece in _split_long(para, target_chars):
+            if buf and len(buf) + len(sep) + len(piece) > target_chars:
+                chunks.append(ChunkText(order=len(chunks), text=buf))
+                buf = ""
+            buf = f"{buf}{sep}{piece}" if buf else piece
+            sep = " "
+    if buf:
+        chunks.append(ChunkText(order=len(chunks), text=buf))
+    return chunks
+
+
+# ---------------------------------------------------------------------------
+# Generators
+# ---------------------------------------------------------------------------
+
+class FlashcardGenerator(Protocol):
+    def generate(self, chunks: Sequence[ChunkText]) -> List[GeneratedCard]:
+        """
+        Return candidate cards for a batch of chunks, each tagged with its source chunk_order
+        (duplicates are filtered by the caller).
+        """
+        ...
+
+
+_definition_re = re.compile(
+    r"^(?P<subject>[A-Z][\w\s,'()-]{1,80}?)\s+(?P<verb>is|are|was|were|refers to|means)\s+(?P<rest>.{3,})$"
+)
+_word_re = re.compile(r"\b[A-Za-z][A-Za-z-]{5,}\b")
+_leading_article_re = re.compile(r"^(?:the|a|an)\s+", re.IGNORECASE)
+# Subjects starting with these refer back to earlier text ("It is...", "This process is...")
+# or are filler ("There are..."), so they do not make a self-contained question.
+_vague_subjects = {
+    "it", "its", "this", "that", "these", "those", "there", "here", "they", "he", "she", "we", "you", "i",
+    "which", "what", "who", "such", "one", "another", "other", "others", "some", "many", "most", "each", "all",
+}
+
+
+def _difficulty(sentence: str) -> str:
+    words = len(sentence.split())
+    if words < 12:
+        return "easy"
+    if words < 25:
+        return "medium"
+    return "hard"
+
+
+class LocalFlashcardGenerator:
+    """
+    Deterministic, offline generator.
+    Definition-style sentences ("X is Y") become "What is X?" cards; other sentences
+    become fill-in-the-blank cards on their longest word. Definition cards take precedence
+    within a chunk's budget. Same input always yields the same cards.
+    """
+
+    def __init__(self, cards_per_chunk: int = 3, min_words: int = 6, max_words: int = 60) -> None:
+        self.cards_per_chunk = cards_per_chunk
+        self.min_words = min_words
+        self.max_words = max_words
+
+    def generate(self, chunks: Sequence[ChunkText]) -> List[GeneratedCard]:
+        cards: List[GeneratedCard] = []
+        for chunk in chunks:
+            definitions: List[GeneratedCard] = []
+            clozes: List[GeneratedCard] = []
+            for sentence in _sentence_re.split(" ".join(chunk.text.split())):
+                sentence = sentence.strip()
+                if not (self.min_words <= len(sentence.split()) <= self.max_words):
+                    continue
+                body = sentence.rstrip(".!?")
+                card = self._definition_card(body, sentence)
+                if card:
+                    definitions.append(replace(card, chunk_order=chunk.order))
+                    if len(definitions) >= self.cards_per_chunk:
+                        break
+                elif len(clozes) < self.cards_per_chunk:
+                    card = self._cloze_card(body, sentence)
+                    if card:
+                        clozes.append(replace(card, chunk_order=chunk.order))
+            cards.extend((definitions + clozes)[: self.cards_per_chunk])
+        return cards
+
+    def _definition_card(self, body: str, sentence: str) -> Optional[GeneratedCard]:
+        m = _definition_re.match(body)
+        if not m:
+            return None
+        subject = _leading_article_re.sub("", m.group("subject").strip())
+        if not subject or subject.split()[0].lower() in _vague_subjects:
+            return None
+        verb, rest = m.group("verb"), m.group("rest").strip()
+        if verb == "refers to":
+            question = f"What does {subject} refer to?"
+        elif verb == "means":
+            question = f"What does {subject} mean?"
+        else:
+            question = f"What {verb} {subject}?"
+        return GeneratedCard(question=question, answer=rest[0].upper() + rest[1:], difficulty=_difficulty(sentence))
+
+    def _cloze_card(self, body: str, sentence: str) -> Optional[GeneratedCard]:
+        candidates = _word_re.findall(body)
+        if not candidates:
+            return None
+        target = max(candidates, key=len)
+        cloze = re.sub(rf"\b{re.escape(target)}\b", "_____", body, count=1)
+        return GeneratedCard(question=f"Fill in the blank: {cloze}.", answer=target, difficulty=_difficulty(sentence))
+
+
+_GENERATORS: Dict[str, Callable[[], FlashcardGenerator]] = {
+    "local": LocalFlashcardGenerator,
+}
+
+
+def register_generator(name: str, factory: Callable[[], FlashcardGenerator]) -> None:
+    """Register a generator backend selectable via FLASHCARD_GENERATOR."""
+    _GENERATORS[name] = factory
+
+
+def get_generator(name: Optional[str] = None) -> FlashcardGenerator:
+    name = name or get_settings().FLASHCARD_GENERATOR
+    try:
+        factory = _GENERATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown flashcard generator: {name}") from None
+    return factory()
+
+
+# ---------------------------------------------------------------------------
+# Dedupe
+# ---------------------------------------------------------------------------
+
+_normalize_re = re.compile(r"[^a-z0-9]+")
+_cloze_prefix_re = re.compile(r"^\s*fill in the blank\s*:?\s*")
+_ignored_tokens = {"a", "an", "the"}
+
+
+def question_hash(question: str) -> str:
+    """
+    Hash of the normalized question: case, punctuation, articles and a leading
+    "Fill in the blank:" are ignored so near-identical wording collides.
+    """
+    question = _cloze_prefix_re.sub("", question.lower())
+    tokens = [t for t in _normalize_re.sub(" ", question).split() if t not in _ignored_tokens]
+    return hashlib.sha1(" ".join(tokens).encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Concurrency limits
+# ---------------------------------------------------------------------------
+
+class FlashcardJobSlot:
+    def __init__(self, limiter: "FlashcardJobLimiter", user_id: str) -> None:
+        self._limiter = limiter
+        self._user_id = user_id
+        self._released = False
+
+    def release(self) -> None:
+        # Idempotent so a failed submit and the job's own cleanup cannot double-release
+        if not self._released:
+            self._released = True
+            self._limiter._release(self._user_id)
+
+
+class FlashcardJobLimiter:
+    """
+    Caps concurrent generation jobs globally and per user (in-process).
+    acquire() never blocks; callers reject the request when no slot is free.
+    """
+
+    def __init__(self, max_jobs: int, max_jobs_per_user: int) -> None:
+        self.max_jobs = max_jobs
+        self.max_jobs_per_user = max_jobs_per_user
+        self._lock = threading.Lock()
+        self._total = 0
+        self._per_user: Dict[str, int] = {}
+
+    def acquire(self, user_id: str) -> Optional[FlashcardJobSlot]:
+        with self._lock:
+            running = self._per_user.get(user_id, 0)
+            if self._total >= self.max_jobs or running >= self.max_jobs_per_user:
+                return None
+            self._total += 1
+            self._per_user[user_id] = running + 1
+        return FlashcardJobSlot(self, user_id)
+
+    def _release(self, user_id: str) -> None:
+        with self._lock:
+            self._total -= 1
+            remaining = self._per_user.get(user_id, 1) - 1
+            if remaining > 0:
+                self._per_user[user_id] = remaining
+            else:
+                self._per_user.pop(user_id, None)
+
+
+@lru_cache(maxsize=1)
+def get_job_limiter() -> FlashcardJobLimiter:
+    s = get_settings()
+    return FlashcardJobLimiter(max_jobs=s.FLASHCARD_MAX_CONCURRENT_JOBS, max_jobs_per_user=s.FLASHCARD_MAX_JOBS_PER_USER)
+
+
+# ---------------------------------------------------------------------------
+# Job
+# ---------------------------------------------------------------------------
+
+_INSERT_BY_DIALECT = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def _insert_ignoring_conflicts(db: Session, model: type):
+    dialect_insert = _INSERT_BY_DIALECT.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        # No portable ON CONFLICT: duplicates surface as IntegrityError and fail the job
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_nothing()
+
+
+def _insert_new_cards(db: Session, rows: List[Dict[str, Any]]) -> Dict[str, datetime]:
+    """
+    Bulk-insert cards, leaving out any that hit the unique question-hash indexes
+    (e.g. written by a concurrent job on the same document).
+    Returns the inserted ids with their database-assigned created_at.
+    """
+    stmt = _insert_ignoring_conflicts(db, Flashcard).returning(Flashcard.id, Flashcard.created_at)
+    return {card_id: created_at for card_id, created_at in db.execute(stmt, rows)}
+
+
+def _processed_chunk_orders(batch: Sequence[ChunkText], leftover: Sequence[GeneratedCard]) -> List[int]:
+    """
+    Chunks of the batch whose cards were all considered. A chunk with cards left over
+    after the max_cards cut stays unprocessed so a later job produces the rest.
+    """
+    if any(card.chunk_order is None for card in leftover):
+        # Cannot tell which chunk the leftovers came from
+        return []
+    cut = {card.chunk_order for card in leftover}
+    return [chunk.order for chunk in batch if chunk.order not in cut]
+
+
+def run_flashcard_job(
+    db: Session,
+    user_id: str,
+    document_id: Optional[str],
+    chunks: Sequence[ChunkText],
+    max_cards: int,
+    generator: FlashcardGenerator,
+    batch_size: int,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Generate cards batch by batch, yielding one event per batch.
+    Each batch is deduped against the user's existing cards for the same source,
+    bulk-inserted and committed before its event is yielded, so streamed cards are persisted.
+    The hashes read at start only avoid sending known duplicates; the unique indexes
+    are what keep concurrent jobs from inserting the same question twice.
+    """
+    seen: Set[str] = set(
+        db.execute(
+            select(Flashcard.question_hash).where(
+                Flashcard.user_id == user_id,
+                Flashcard.document_id.is_(None) if document_id is None else Flashcard.document_id == document_id,
+            )
+        ).scalars()
+    )
+
+    batch_size = max(1, batch_size)
+    total_batches = (len(chunks) + batch_size - 1) // batch_size
+    created = 0
+    duplicates = 0
+
+    for batch_no in range(total_batches):
+        if created >= max_cards:
+            break
+        batch = chunks[batch_no * batch_size:(batch_no + 1) * batch_size]
+
+        cards = generator.generate(batch)
+        rows: List[Dict[str, Any]] = []
+        considered = 0
+        for card in cards:
+            if created + len(rows) >= max_cards:
+                break
+            considered += 1
+            digest = question_hash(card.question)
+            if digest in seen:
+                duplicates += 1
+                continue
+            seen.add(digest)
+            rows.append(
+                {
+                    "id": str(uuid4()),
+                    "user_id": user_id,
+                    "document_id": document_id,
+                    "question": card.question,
+                    "answer": card.answer,
+                    "difficulty": card.difficulty,
+                    "chunk_order": card.chunk_order,
+                    "question_hash": digest,
+                }
+            )
+
+        if rows:
+            inserted = _insert_new_cards(db, rows)
+            duplicates += len(rows) - len(inserted)
+            rows = [{**r, "created_at": inserted[r["id"]]} for r in rows if r["id"] in inserted]
+            created += len(rows)
+        if document_id is not None:
+            processed = _processed_chunk_orders(batch, cards[considered:])
+            if processed:
+                db.execute(
+                    _insert_ignoring_conflicts(db, FlashcardChunk),
+                    [{"id": str(uuid4()), "user_id": user_id, "document_id": document_id, "chunk_order": o} for o in processed],
+                )
+        db.commit()
+
+        yield {
+            "event": "cards",
+            "batch": batch_no + 1,
+            "total_batches": total_batches,
+            "cards": [FlashcardOut.model_validate(r).model_dump(mode="json") for r in rows],
+        }
+
+    yield {"event": "done", "created": created, "skipped_duplicates": duplicates}
+
+
+class FlashcardJob:
+    """
+    A generation job running on the job executor. The HTTP stream follows its events;
+    the job itself keeps going (and saving cards) if the client goes away.
+    """
+
+    def __init__(self) -> None:
+        self._events: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self.finished = threading.Event()
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self._events.put(event)
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        while True:
+            event = self._events.get()
+            yield event
+            if event["event"] in ("done", "error"):
+                return
+
+
+@lru_cache(maxsize=1)
+def get_job_executor() -> ThreadPoolExecutor:
+    # Sized to the global job cap, so an admitted job never waits for a worker
+    return ThreadPoolExecutor(max_workers=get_settings().FLASHCARD_MAX_CONCURRENT_JOBS, thread_name_prefix="flashcards")
+
+
+def start_flashcard_job(session_factory: Callable[[], Session], slot: FlashcardJobSlot, **job_args: Any) -> FlashcardJob:
+    """
+    Run run_flashcard_job on the executor with its own session, independent of the request.
+    The slot is released when the job finishes, not when the response ends.
+    """
+    job = FlashcardJob()
+
+    def run() -> None:
+        db = session_factory()
+        try:
+            for event in run_flashcard_job(db, **job_args):
+                job.publish(event)
+        except Exception:
+            logger.exception("Flashcard job failed for user %s", job_args.get("user_id"))
+            db.rollback()
+            job.publish({"event": "error", "detail": "Flashcard generation failed"})
+        finally:
+            db.close()
+            slot.release()
+            job.finished.set()
+
+    try:
+        get_job_executor().submit(run)
+    except Exception:
+        slot.release()
+        raise
+    return job
+
+
+def encode_ndjson(event: Dict[str, Any]) -> str:
+    return json.dumps(event) + "\n"
+
+
+def encode_sse(event: Dict[str, Any]) -> str:
+    payload = {k: v for k, v in event.items() if k != "event"}
+    return f"event: {event['event']}\ndata: {json.dumps(payload)}\n\n"
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import time
+from typing import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import flashcards as flashcards_api
+from app.core.database import Base, get_db
+from app.core.security import create_access_token
+from app.main import app
+from app.models.user import User
+from app.services.flashcards import FlashcardJobLimiter
+
+
+@pytest.fixture
+def session_factory() -> Generator[sessionmaker, None, None]:
+    # In-memory SQLite shared across threads (request handler + streaming worker)
+    engine = create_engine(
+        "sqlite://",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory: sessionmaker) -> Generator[Session, None, None]:
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user(db: Session) -> User:
+    u = User(email="student@example.com", password_hash="x")
+    db.add(u)
+    db.commit()
+    return u
+
+
+@pytest.fixture
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(subject=user.id)}"}
+
+
+@pytest.fixture
+def limiter(monkeypatch: pytest.MonkeyPatch) -> FlashcardJobLimiter:
+    lim = FlashcardJobLimiter(max_jobs=8, max_jobs_per_user=2)
+    monkeypatch.setattr(flashcards_api, "get_job_limiter", lambda: lim)
+    return lim
+
+
+@pytest.fixture
+def client(session_factory: sessionmaker, limiter: FlashcardJobLimiter, monkeypatch: pytest.MonkeyPatch) -> Generator[TestClient, None, None]:
+    def _get_db() -> Generator[Session, None, None]:
+        session = session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    monkeypatch.setattr(flashcards_api, "SessionLocal", session_factory)
+    # Not used as a context manager: startup would create tables in the configured dev database
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    # Let background jobs finish before the in-memory database is disposed
+    deadline = time.monotonic() + 5
+    while limiter._total and time.monotonic() < deadline:
+        time.sleep(0.01)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from sqlalchemy import func, select
+
+from app.models.chunk import Chunk
+from app.models.document import Document
+from app.models.flashcard import Flashcard
+from app.services.flashcards import (
+    ChunkText,
+    FlashcardJobLimiter,
+    LocalFlashcardGenerator,
+    _insert_new_cards,
+    load_document_chunks,
+    question_hash,
+    run_flashcard_job,
+    select_representative,
+    split_text,
+)
+
+
+def test_split_text_without_paragraph_breaks_stays_near_target():
+    sentence = "Cells divide by mitosis to produce two identical daughter cells. "
+    text = sentence * 5000  # ~320k characters, no blank lines
+
+    chunks = split_text(text, target_chars=2000)
+
+    assert len(chunks) > 100
+    assert all(len(c.text) <= 2000 for c in chunks)
+    assert [c.order for c in chunks] == list(range(len(chunks)))
+
+
+def test_split_text_hard_splits_a_sentence_without_punctuation():
+    chunks = split_text("word " * 1000, target_chars=300)
+
+    assert len(chunks) > 1
+    assert all(len(c.text) <= 300 for c in chunks)
+
+
+def test_split_text_packs_short_paragraphs_together():
+    chunks = split_text("First paragraph.\n\nSecond paragraph.\n\n\nThird.", target_chars=2000)
+
+    assert [c.text for c in chunks] == ["First paragraph.\n\nSecond paragraph.\n\nThird."]
+
+
+def test_local_generator_skips_vague_subjects_and_prefers_definitions():
+    text = (
+        "It is important to note the following points about cells. "
+        "This is a key idea that comes up in every exam. "
+        "There are many organelles inside a typical animal cell. "
+        "The mitochondria is the organelle that produces most of the cell's energy. "
+        "Osmosis is the movement of water across a semipermeable membrane."
+    )
+
+    cards = LocalFlashcardGenerator(cards_per_chunk=3).generate([ChunkText(order=0, text=text)])
+    questions = [c.question for c in cards]
+
+    assert questions[:2] == ["What is mitochondria?", "What is Osmosis?"]
+    assert not any(q in questions for q in ("What is It?", "What is This?", "What are There?"))
+    assert len(cards) == 3
+
+
+def test_local_generator_is_deterministic():
+    chunk = ChunkText(order=0, text="Enzymes accelerate biochemical reactions without being consumed.")
+    gen = LocalFlashcardGenerator()
+
+    assert gen.generate([chunk]) == gen.generate([chunk])
+
+
+def test_insert_new_cards_ignores_rows_already_in_the_database(db, user):
+    def row(card_id: str, document_id=None) -> dict:
+        return {
+            "id": card_id,
+            "user_id": user.id,
+            "document_id": document_id,
+            "question": "What is Osmosis?",
+            "answer": "Water movement",
+            "difficulty": "easy",
+            "question_hash": question_hash("What is Osmosis?"),
+        }
+
+    assert list(_insert_new_cards(db, [row("a")])) == ["a"]
+    # A second job racing on the same source hits the unique index instead of duplicating
+    assert _insert_new_cards(db, [row("b"), row("c")]) == {}
+    db.commit()
+
+    assert db.execute(select(func.count()).select_from(Flashcard)).scalar_one() == 1
+
+
+def _document_with_chunks(db, user, count: int) -> Document:
+    doc = Document(user_id=user.id, title="Biology", file_url="http://example.com/bio.pdf")
+    db.add(doc)
+    db.flush()
+    for i in range(count):
+        db.add(Chunk(document_id=doc.id, chunk_order=i, text=f"Term{i} is the concept number {i} in this course."))
+    db.commit()
+    return doc
+
+
+def _run(db, user, doc, limit: int, **kwargs) -> list:
+    chunks = load_document_chunks(db, doc.id, user_id=user.id, limit=limit)
+    params = {"max_cards": 500, "generator": LocalFlashcardGenerator(), "batch_size": 4, **kwargs}
+    return list(run_flashcard_job(db, user_id=user.id, document_id=doc.id, chunks=chunks, **params))
+
+
+def test_repeat_jobs_sample_chunks_not_used_before(db, user):
+    doc = _document_with_chunks(db, user, count=20)
+
+    first = _run(db, user, doc, limit=5)
+    second = _run(db, user, doc, limit=5)
+
+    assert first[-1]["created"] == 5
+    assert second[-1] == {"event": "done", "created": 5, "skipped_duplicates": 0}
+    orders = db.execute(select(Flashcard.chunk_order)).scalars().all()
+    assert len(set(orders)) == 10
+
+
+def test_select_representative_takes_longest_per_window():
+    lengths = [1, 5, 2, 9, 3, 3, 7, 1]
+
+    assert select_representative(lengths, 4) == [1, 3, 4, 6]
+    assert select_representative(lengths, 20) == list(range(8))
+    assert select_representative(lengths, 0) == []
+    assert select_representative([], 4) == []
+
+
+def test_select_representative_spans_the_whole_document():
+    picked = select_representative([100] * 300, 64)
+
+    assert len(picked) == 64
+    assert picked[0] < 5 and picked[-1] >= 295
+    assert picked == sorted(set(picked))
+
+
+def test_question_hash_ignores_case_punctuation_and_articles():
+    assert question_hash("What is the mitochondria?") == question_hash("what is mitochondria")
+    assert question_hash("Fill in the blank: Cells divide by _____.") == question_hash("Cells divide by _____")
+    assert question_hash("What is osmosis?") != question_hash("What is diffusion?")
+    # "in" is only dropped as part of the cloze prefix, not from the question body
+    assert question_hash("Fill in the blank: Ions move in _____.") != question_hash("Fill in the blank: Ions move _____.")
+
+
+def test_job_limiter_enforces_per_user_and_global_caps():
+    limiter = FlashcardJobLimiter(max_jobs=3, max_jobs_per_user=2)
+
+    a1, a2 = limiter.acquire("a"), limiter.acquire("a")
+    assert a1 and a2
+    assert limiter.acquire("a") is None
+
+    b1 = limiter.acquire("b")
+    assert b1
+    assert limiter.acquire("c") is None  # global cap
+
+    a1.release()
+    a1.release()  # idempotent
+    assert limiter._per_user == {"a": 1, "b": 1}
+    assert limiter.acquire("c") is not None
+
+
+def test_run_flashcard_job_batches_and_stops_at_max_cards(db, user):
+    doc = _document_with_chunks(db, user, count=10)
+
+    events = _run(db, user, doc, limit=10, max_cards=6, batch_size=4)
+
+    assert [e["event"] for e in events] == ["cards", "cards", "done"]
+    assert [len(e["cards"]) for e in events[:-1]] == [4, 2]
+    assert all(e["total_batches"] == 3 for e in events[:-1])
+    assert events[-1] == {"event": "done", "created": 6, "skipped_duplicates": 0}
+
+
+def test_run_flashcard_job_dedupes_text_cards_across_runs(db, user):
+    chunks = split_text("Osmosis is the movement of water across a membrane.\n\nDiffusion is the spread of particles.")
+
+    def run() -> dict:
+        events = list(
+            run_flashcard_job(
+                db,
+                user_id=user.id,
+                document_id=None,
+                chunks=chunks,
+                max_cards=50,
+                generator=LocalFlashcardGenerator(),
+                batch_size=8,
+            )
+        )
+        return events[-1]
+
+    assert run() == {"event": "done", "created": 2, "skipped_duplicates": 0}
+    assert run() == {"event": "done", "created": 0, "skipped_duplicates": 2}
+
+
+def test_chunk_without_cards_is_not_sampled_again(db, user):
+    doc = Document(user_id=user.id, title="Biology", file_url="http://example.com/bio.pdf")
+    db.add(doc)
+    db.flush()
+    db.add(Chunk(document_id=doc.id, chunk_order=0, text="Osmosis is the movement of water across a membrane."))
+    db.add(Chunk(document_id=doc.id, chunk_order=1, text="Figure 3: cell."))
+    db.commit()
+
+    assert _run(db, user, doc, limit=10)[-1]["created"] == 1
+    assert load_document_chunks(db, doc.id, user_id=user.id, limit=10) == []
+
+
+def test_chunk_cut_by_max_cards_is_finished_by_the_next_job(db, user):
+    doc = Document(user_id=user.id, title="Biology", file_url="http://example.com/bio.pdf")
+    db.add(doc)
+    db.flush()
+    text = (
+        "Osmosis is the movement of water across a membrane. "
+        "Diffusion is the spread of particles from high to low concentration. "
+        "Mitosis is the division of a cell into two identical cells."
+    )
+    db.add(Chunk(document_id=doc.id, chunk_order=0, text=text))
+    db.commit()
+
+    assert _run(db, user, doc, limit=10, max_cards=2)[-1] == {"event": "done", "created": 2, "skipped_duplicates": 0}
+    assert _run(db, user, doc, limit=10, max_cards=2)[-1] == {"event": "done", "created": 1, "skipped_duplicates": 2}
+    assert load_document_chunks(db, doc.id, user_id=user.id, limit=10) == []
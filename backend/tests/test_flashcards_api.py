@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.api import flashcards as flashcards_api
+from app.core.database import get_db
+from app.main import app
+from app.models.chunk import Chunk
+from app.models.document import Document
+from app.models.user import User
+from app.services.flashcards import encode_ndjson
+
+TEXT = "Osmosis is the movement of water across a semipermeable membrane."
+
+
+def _call_with_dropped_connection(headers: dict, body: dict) -> None:
+    """Drive the app over raw ASGI with a client that is gone before the response starts."""
+    raw = json.dumps(body).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/flashcards",
+        "raw_path": b"/flashcards",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")]
+        + [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": raw, "more_body": False}]
+
+    async def receive() -> dict:
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            raise OSError("client disconnected")
+
+    with pytest.raises(OSError):
+        asyncio.run(app(scope, receive, send))
+
+
+def _wait_for_jobs(limiter, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while limiter._total and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_dropped_connection_keeps_generating_and_releases_job_slot(client, auth_headers, limiter):
+    texts = [TEXT, "Diffusion is the spread of particles from high to low concentration.", "Mitosis is the division of one cell into two cells."]
+    for text in texts:
+        _call_with_dropped_connection(auth_headers, {"text": text})
+        _wait_for_jobs(limiter)
+
+    assert limiter._total == 0
+    assert limiter._per_user == {}
+    # The jobs ran to completion without a client reading the stream
+    listed = client.get("/flashcards", headers=auth_headers).json()
+    assert sorted(c["question"] for c in listed) == ["What is Diffusion?", "What is Mitosis?", "What is Osmosis?"]
+
+
+def test_generate_streams_ndjson_by_default(client, auth_headers):
+    r = client.post("/flashcards", json={"text": TEXT}, headers=auth_headers)
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in r.text.splitlines()]
+    assert [e["event"] for e in events] == ["cards", "done"]
+    assert events[0]["cards"][0]["question"] == "What is Osmosis?"
+    assert events[-1] == {"event": "done", "created": 1, "skipped_duplicates": 0}
+
+    listed = client.get("/flashcards", headers=auth_headers).json()
+    assert [c["question"] for c in listed] == ["What is Osmosis?"]
+
+
+def test_generate_streams_sse_when_requested(client, auth_headers):
+    headers = {**auth_headers, "Accept": "text/event-stream"}
+    r = client.post("/flashcards", json={"text": TEXT}, headers=headers)
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    frames = [f for f in r.text.split("\n\n") if f]
+    assert [f.splitlines()[0] for f in frames] == ["event: cards", "event: done"]
+    done = json.loads(frames[-1].splitlines()[1][len("data: "):])
+    assert done == {"created": 1, "skipped_duplicates": 0}
+
+
+def test_generate_requires_exactly_one_source(client, auth_headers):
+    assert client.post("/flashcards", json={}, headers=auth_headers).status_code == 422
+    both = {"text": TEXT, "document_id": "x"}
+    assert client.post("/flashcards", json=both, headers=auth_headers).status_code == 422
+
+
+def test_generate_returns_409_for_unprocessed_or_exhausted_document(client, auth_headers, db, user):
+    doc = Document(user_id=user.id, title="Biology", file_url="http://example.com/bio.pdf")
+    db.add(doc)
+    db.commit()
+
+    r = client.post("/flashcards", json={"document_id": doc.id}, headers=auth_headers)
+    assert r.status_code == 409
+
+    db.add(Chunk(document_id=doc.id, chunk_order=0, text=TEXT))
+    db.commit()
+    assert client.post("/flashcards", json={"document_id": doc.id}, headers=auth_headers).status_code == 200
+
+    r = client.post("/flashcards", json={"document_id": doc.id}, headers=auth_headers)
+    assert r.status_code == 409
+    assert "already generated" in r.json()["detail"]
+
+
+def test_generate_returns_403_for_another_users_document(client, auth_headers, db):
+    other = User(email="other@example.com", password_hash="x")
+    db.add(other)
+    db.flush()
+    doc = Document(user_id=other.id, title="Private", file_url="http://example.com/p.pdf")
+    db.add(doc)
+    db.commit()
+
+    assert client.post("/flashcards", json={"document_id": doc.id}, headers=auth_headers).status_code == 403
+
+
+def test_generate_returns_429_when_user_has_no_free_slot(client, auth_headers, limiter, user):
+    held = [limiter.acquire(user.id) for _ in range(limiter.max_jobs_per_user)]
+
+    assert client.post("/flashcards", json={"text": TEXT}, headers=auth_headers).status_code == 429
+
+    for slot in held:
+        slot.release()
+    assert client.post("/flashcards", json={"text": TEXT}, headers=auth_headers).status_code == 200
+
+
+def test_request_session_is_released_before_streaming(client, auth_headers, session_factory, monkeypatch):
+    order = []
+
+    def _get_db():
+        session = session_factory()
+        close = session.close
+
+        def tracked_close():
+            order.append("close-request-db")
+            close()
+
+        session.close = tracked_close
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    def tracked_encode(event):
+        order.append(f"event {event['event']}")
+        return encode_ndjson(event)
+
+    app.dependency_overrides[get_db] = _get_db
+    monkeypatch.setattr(flashcards_api, "encode_ndjson", tracked_encode)
+
+    r = client.post("/flashcards", json={"text": TEXT}, headers=auth_headers)
+
+    assert r.status_code == 200
+    assert order[:3] == ["close-request-db", "event cards", "event done"]